@@ -17,7 +17,10 @@
 # here is because the existing k8s.assert_condition_state_message doesn't
 # actually assert anything. It returns true or false and logs messages.
 
+import time
+
 import pytest
+from kubernetes import client, watch
 
 from acktest.k8s import resource as k8s
 
@@ -143,3 +146,90 @@ def assert_not_synced(ref: k8s.CustomResourceReference):
         a False status.
     """
     return assert_synced_status(ref, False)
+
+
+def _has_type_status(
+    resource: dict,
+    cond_type_match: str,
+    cond_status_match: bool,
+) -> bool:
+    conditions = (resource.get('status') or {}).get('conditions') or []
+    for cond in conditions:
+        if cond.get('type') == cond_type_match:
+            return str(cond.get('status', None)) == str(cond_status_match)
+    return False
+
+
+def wait_on_condition_watch(
+    ref: k8s.CustomResourceReference,
+    cond_type_match: str = CONDITION_TYPE_RESOURCE_SYNCED,
+    cond_status_match: bool = True,
+    timeout: int = 600,
+):
+    """Waits until the supplied resource has a condition of the given type in
+    the given status, using a Kubernetes watch rather than periodic GETs so
+    that the change is observed as soon as the controller writes it.
+
+    Usage:
+        from acktest.k8s import resource as k8s
+
+        from e2e import condition
+
+        ref = k8s.CustomResourceReference(
+            CRD_GROUP, CRD_VERSION, RESOURCE_PLURAL,
+            db_cluster_id, namespace="default",
+        )
+        k8s.create_custom_resource(ref, resource_data)
+        k8s.wait_resource_consumed_by_controller(ref)
+        resource = condition.wait_on_condition_watch(
+            ref,
+            condition.CONDITION_TYPE_RESOURCE_SYNCED,
+            True,
+            timeout=600)
+        assert resource is not None
+
+    Returns:
+        The custom resource once the condition is observed, so callers need
+        not GET it again, or None if the resource is deleted or `timeout`
+        seconds elapse first.
+    """
+    return _watch_for_type_status(
+        ref, cond_type_match, cond_status_match, timeout)
+
+
+def _watch_for_type_status(
+    ref: k8s.CustomResourceReference,
+    cond_type_match: str,
+    cond_status_match: bool,
+    timeout: int,
+):
+    api = client.CustomObjectsApi(k8s._get_k8s_api_client())
+    if ref.namespace is None:
+        list_fn = api.list_cluster_custom_object
+        list_args = (ref.group, ref.version, ref.plural)
+    else:
+        list_fn = api.list_namespaced_custom_object
+        list_args = (ref.group, ref.version, ref.namespace, ref.plural)
+
+    deadline = time.monotonic() + timeout
+    w = watch.Watch()
+    try:
+        # The API server may close a watch before its timeout expires, so the
+        # stream is re-established until the deadline passes. Every new
+        # stream starts with an ADDED event carrying the current state.
+        while True:
+            remaining = int(deadline - time.monotonic())
+            if remaining <= 0:
+                return None
+            for event in w.stream(
+                list_fn,
+                *list_args,
+                field_selector=f"metadata.name={ref.name}",
+                timeout_seconds=remaining,
+            ):
+                if event['type'] == 'DELETED':
+                    return None
+                if _has_type_status(event['object'], cond_type_match, cond_status_match):
+                    return event['object']
+    finally:
+        w.stop()
@@ -11,15 +11,53 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
+import collections
+import functools
+import logging
+from datetime import datetime, timedelta, timezone
 import os
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 import pytest
+import yaml
+from botocore.config import Config
 
 from acktest import k8s
+from acktest.k8s import resource as k8s_resource
+from acktest.resources import random_suffix_name
+from e2e import CRD_GROUP, CRD_VERSION, YamlDumper, load_prometheusservice_resource
+from e2e.replacement_values import REPLACEMENT_VALUES
+from e2e.bootstrap_resources import get_bootstrap_resources
+from e2e import condition
+
+MAX_WAIT_FOR_SYNCED_MINUTES = 10
+CLEANUP_MAX_WORKERS = 3
+
+# Every workspace created by the suite carries this tag (see
+# resources/workspace.yaml), so that ones leaked by earlier runs can be found.
+E2E_TAG_KEY = "ack-e2e"
+E2E_TAG_VALUE = "true"
+# A serial run with several slow syncs can take well over an hour, and other
+# CI jobs may share the account, so only workspaces older than any plausible
+# run are treated as leaked.
+ORPHANED_WORKSPACE_MIN_AGE = timedelta(hours=12)
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
 
 
 def pytest_addoption(parser):
     parser.addoption("--runslow", action="store_true", default=False, help="run slow tests")
+    parser.addoption(
+        "--deep", action="store_true", default=_env_flag("ACK_E2E_DEEP_VERIFY"),
+        help="re-verify synced resources against AWS (also enabled by ACK_E2E_DEEP_VERIFY=1)",
+    )
+    parser.addoption(
+        "--gc-orphans", action="store_true", default=_env_flag("ACK_E2E_GC_ORPHANS"),
+        help="delete workspaces leaked by earlier runs (also enabled by ACK_E2E_GC_ORPHANS=1)",
+    )
 
 
 def pytest_configure(config):
@@ -41,11 +79,227 @@ def pytest_collection_modifyitems(config, items):
         if "slow" in item.keywords:
             item.add_marker(skip_slow)
 
+# Once the controller marks a resource as synced it has already compared the
+# AWS resource with the spec, so describing it again from the test only
+# duplicates that check. Those extra round trips are made only for deep
+# verification runs, e.g. nightly, enabled with --deep or ACK_E2E_DEEP_VERIFY.
+@pytest.fixture(scope='session')
+def deep_verify(request):
+    return request.config.getoption("--deep")
+
 # Provide a k8s client to interact with the integration test cluster
 @pytest.fixture(scope='class')
 def k8s_client():
     return k8s._get_k8s_api_client()
 
-@pytest.fixture(scope='module')
+# boto3 clients are thread-safe, so a single client can be shared by the
+# whole session. Throttled calls are retried with backoff, since concurrent
+# cleanup and xdist workers can push AMP past its request rate limits.
+@pytest.fixture(scope='session')
 def prometheusservice_client():
-    return boto3.client('amp')
\ No newline at end of file
+    return boto3.client('amp', config=Config(retries={'max_attempts': 10, 'mode': 'standard'}))
+
+@pytest.fixture(scope='session', autouse=True)
+def _gc_orphans(request, prometheusservice_client):
+    """Deletes workspaces leaked by earlier runs of the suite, e.g. ones whose
+    cluster went away before the workspace CR could be deleted, so they do not
+    count against the account's workspace quota. Only runs with --gc-orphans.
+    """
+    if not request.config.getoption("--gc-orphans"):
+        return
+    cutoff = datetime.now(timezone.utc) - ORPHANED_WORKSPACE_MIN_AGE
+    orphans = []
+    paginator = prometheusservice_client.get_paginator('list_workspaces')
+    for page in paginator.paginate():
+        for workspace in page['workspaces']:
+            if (workspace.get('tags', {}).get(E2E_TAG_KEY) == E2E_TAG_VALUE
+                    and workspace['createdAt'] < cutoff
+                    and workspace['status']['statusCode'] != 'DELETING'):
+                orphans.append(workspace['workspaceId'])
+
+    def delete_orphan(workspace_id):
+        # Other xdist workers run this fixture too, so the workspace may
+        # already be on its way out.
+        try:
+            prometheusservice_client.delete_workspace(workspaceId=workspace_id)
+        except Exception as e:
+            logging.warning(f"Failed to delete orphaned workspace {workspace_id}: {e}")
+
+    with ThreadPoolExecutor(max_workers=CLEANUP_MAX_WORKERS) as executor:
+        executor.map(delete_orphan, orphans)
+
+def _worker_id(config) -> str:
+    # pytest-xdist only sets workerinput on worker processes. Reading it here
+    # rather than requesting xdist's worker_id fixture keeps the suite
+    # runnable without pytest-xdist installed.
+    workerinput = getattr(config, 'workerinput', None)
+    if workerinput is None:
+        return "master"
+    return workerinput['workerid']
+
+# Creating an AMP workspace is the slowest step of the suite, so a single
+# workspace is shared by every test module that needs one to live in. When
+# the suite is distributed with pytest-xdist, e.g.
+#
+#   pytest -n auto --dist=loadfile test/e2e/tests
+#
+# each worker runs its own session and therefore provisions its own
+# workspace, which keeps tests relying on one-per-workspace resources (such
+# as the alert manager definition or logging configuration) from racing each
+# other across workers. The workspace name is keyed on the worker id, and
+# every other resource name gets a random suffix from the worker's own
+# process-seeded RNG, so CR names do not collide between workers either.
+@pytest.fixture(scope='session')
+def workspace_resource(request):
+    resource_name = random_suffix_name(f"amp-workspace-{_worker_id(request.config)}", 32)
+
+    replacements = {
+        **REPLACEMENT_VALUES,
+        'WORKSPACE_ALIAS': resource_name,
+    }
+
+    resource_data = load_prometheusservice_resource(
+        "workspace",
+        additional_replacements=replacements,
+    )
+
+    workspace_ref = k8s_resource.CustomResourceReference(
+        CRD_GROUP, CRD_VERSION, "workspaces",
+        resource_name, namespace="default",
+    )
+
+    # Create workspace
+    k8s_resource.create_custom_resource(workspace_ref, resource_data)
+    workspace_resource = k8s_resource.wait_resource_consumed_by_controller(workspace_ref)
+
+    assert workspace_resource is not None
+    assert k8s_resource.get_resource_exists(workspace_ref)
+
+    assert condition.wait_on_condition_watch(workspace_ref, condition.CONDITION_TYPE_RESOURCE_SYNCED, True, timeout=MAX_WAIT_FOR_SYNCED_MINUTES * 60)
+    assert 'workspaceID' in workspace_resource['status']
+
+    yield (workspace_ref, workspace_resource)
+
+    _, deleted = k8s_resource.delete_custom_resource(workspace_ref)
+    assert deleted
+
+# Indentation of the `configuration` block scalar in the CR templates.
+CONFIGURATION_INDENT = "    "
+
+def _indent_configuration(configuration_str: str) -> str:
+    """Indents a rendered configuration so it can be substituted into a CR
+    template. The first line is left alone since the template already indents
+    the placeholder.
+    """
+    return textwrap.indent(configuration_str, CONFIGURATION_INDENT)[len(CONFIGURATION_INDENT):]
+
+@functools.lru_cache(maxsize=None)
+def _render_alert_manager_configuration(template_name: str, sns_topic_name: str, sns_topic_arn: str) -> str:
+    """Returns the alert manager configuration rendered as a string."""
+    config_replacements = {
+        **REPLACEMENT_VALUES,
+        'SNS_TOPIC_NAME': sns_topic_name,
+        'SNS_TOPIC_ARN': sns_topic_arn,
+    }
+    configuration_data = load_prometheusservice_resource(
+        template_name,
+        additional_replacements=config_replacements,
+    )
+    return yaml.dump(configuration_data, Dumper=YamlDumper)
+
+# The bootstrap resources are created before the suite runs and are only
+# read by the tests, so they are loaded once per session.
+@pytest.fixture(scope='session')
+def bootstrap():
+    return get_bootstrap_resources()
+
+@pytest.fixture(scope='session')
+def sns_topic(bootstrap):
+    topic = bootstrap.AlertManagerSNSTopic
+    return (topic.name, topic.arn)
+
+@pytest.fixture(scope='session')
+def rendered_alert_configs(sns_topic):
+    """Maps each alert manager configuration kind to the rendered
+    configuration and its indented form.
+    """
+    (sns_topic_name, sns_topic_arn) = sns_topic
+    rendered = {}
+    for kind, template_name in (
+        ("valid", "alert_manager_configuration"),
+        ("invalid", "invalid_alert_manager_configuration"),
+    ):
+        configuration_str = _render_alert_manager_configuration(
+            template_name, sns_topic_name, sns_topic_arn)
+        rendered[kind] = (configuration_str, _indent_configuration(configuration_str))
+    return rendered
+
+@pytest.fixture(scope='session')
+def rendered_rule_configs():
+    """Maps the name given to the first rule group of the rule groups
+    configuration to the rendered configuration and its indented form.
+    """
+    rendered = {}
+    for rule_name in ("test-rule", "new-test-rule"):
+        configuration_data = load_prometheusservice_resource(
+            "rule_groups_configuration_data",
+            additional_replacements=collections.ChainMap({'RULE_NAME': rule_name}, REPLACEMENT_VALUES),
+        )
+        configuration_str = yaml.dump(configuration_data, Dumper=YamlDumper)
+        rendered[rule_name] = (configuration_str, _indent_configuration(configuration_str))
+    return rendered
+
+@pytest.fixture
+def created_resources():
+    """Yields a list that tests append the references of the CRs they create
+    to. Whichever of them still exist when the test finishes, whether it
+    passed or not, are deleted.
+    """
+    refs = []
+    yield refs
+
+    # Each delete blocks until the CR is gone, so they are run concurrently.
+    with ThreadPoolExecutor(max_workers=CLEANUP_MAX_WORKERS) as executor:
+        executor.map(_clean_up_resource, refs)
+
+def _clean_up_resource(ref):
+    try:
+        if k8s_resource.get_resource_exists(ref):
+            k8s_resource.delete_custom_resource(ref)
+    except Exception as e:
+        logging.warning(f"Failed to clean up {ref.plural}/{ref.name}: {e}")
+
+@pytest.fixture
+def am_resource_factory(workspace_resource, rendered_alert_configs, created_resources):
+    """Returns a function building an alert manager definition CR in the
+    shared workspace. The reference of every CR built is registered in
+    `created_resources` so it is cleaned up after the test.
+    """
+    (_, workspace_res) = workspace_resource
+    workspace_id = workspace_res['status']['workspaceID']
+
+    def make(config_kind: str = "valid", resource_name: str = None):
+        if resource_name is None:
+            resource_name = random_suffix_name("alert-manager-definition", 30)
+        configuration_str, configuration_str_indented = rendered_alert_configs[config_kind]
+
+        replacements = {
+            **REPLACEMENT_VALUES,
+            'WORKSPACE_ID': workspace_id,
+            'ALERT_MANAGER_DEFINITION_NAME': resource_name,
+            'CONFIGURATION': configuration_str_indented,
+        }
+
+        resource_data = load_prometheusservice_resource(
+            "alert_manager_definition",
+            additional_replacements=replacements,
+        )
+
+        am_ref = k8s_resource.CustomResourceReference(
+            CRD_GROUP, CRD_VERSION, "alertmanagerdefinitions",
+            resource_name, namespace="default",
+        )
+        created_resources.append(am_ref)
+        return (am_ref, resource_data, configuration_str)
+
+    return make
@@ -15,56 +15,26 @@
 """
 
 import logging
-import time
 import pytest
 
 from acktest.k8s import resource as k8s
-from acktest.k8s import condition
 from acktest import tags as tags
 from acktest.resources import random_suffix_name
 from e2e import service_marker, CRD_GROUP, CRD_VERSION, load_prometheusservice_resource
 from e2e.replacement_values import REPLACEMENT_VALUES
-from e2e.bootstrap_resources import get_bootstrap_resources
+from e2e import condition, waits
 
 RESOURCE_KIND = "loggingconfiguration"
 RESOURCE_PLURAL = "loggingconfigurations"
 
-MODIFY_WAIT_AFTER_SECONDS = 10
 MAX_WAIT_FOR_SYNCED_MINUTES = 10
+MAX_WAIT_FOR_SYNCED_SECONDS = MAX_WAIT_FOR_SYNCED_MINUTES * 60
 DELETE_WAIT_AFTER_SECONDS = 60
 
-@pytest.fixture(scope="module")
-def workspace_resource():
-        resource_name = random_suffix_name("amp-workspace", 24)
-        resources = get_bootstrap_resources()
 
-        replacements = REPLACEMENT_VALUES.copy()
-        replacements['WORKSPACE_ALIAS'] = resource_name
+def _lc_status(resource):
+    return waits.get_status_code(resource)
 
-        resource_data = load_prometheusservice_resource(
-            "workspace",
-            additional_replacements=replacements,
-        )
-        
-        workspace_ref = k8s.CustomResourceReference(
-            CRD_GROUP, CRD_VERSION, "workspaces",
-            resource_name, namespace="default",
-        )
-
-        # Create workspace
-        k8s.create_custom_resource(workspace_ref, resource_data)
-        workspace_resource = k8s.wait_resource_consumed_by_controller(workspace_ref)
-
-        assert workspace_resource is not None
-        assert k8s.get_resource_exists(workspace_ref)
-
-        assert k8s.wait_on_condition(workspace_ref, "ACK.ResourceSynced", "True", wait_periods=MAX_WAIT_FOR_SYNCED_MINUTES)
-        assert 'workspaceID' in workspace_resource['status']
-
-        yield (workspace_ref, workspace_resource)
-
-        _, deleted = k8s.delete_custom_resource(workspace_ref)
-        assert deleted
 
 @service_marker
 @pytest.mark.canary
@@ -76,25 +46,28 @@ class TestLoggingConfiguration:
             )
             return resp
 
-        except Exception as e:
+        except prometheusservice_client.exceptions.ResourceNotFoundException as e:
             logging.debug(e)
             return None
 
-    def test_successful_crud_logging_configuration(self, prometheusservice_client, workspace_resource):
+    def test_successful_crud_logging_configuration(self, prometheusservice_client, workspace_resource, bootstrap, deep_verify, created_resources):
         resource_name = random_suffix_name("logging-configuration", 30)
 
         # Create the workspace where the logging configuration definition will be stored. 
         (_, workspace_res) = workspace_resource
         workspace_id = workspace_res['status']['workspaceID']
 
-        # Set the log group ARN
-        log_group_arn = get_bootstrap_resources().LoggingConfigurationLogGroup1.arn
+        # Set the log group ARNs. The second one is used by the update below.
+        log_group_arn = bootstrap.LoggingConfigurationLogGroup1.arn
+        new_log_group_arn = bootstrap.LoggingConfigurationLogGroup2.arn
 
         # Now, load the full CR
-        replacements = REPLACEMENT_VALUES.copy()
-        replacements['WORKSPACE_ID'] = workspace_id
-        replacements['LOGGING_CONFIGURATION_NAME'] = resource_name
-        replacements['LOG_GROUP_ARN'] = log_group_arn
+        replacements = {
+            **REPLACEMENT_VALUES,
+            'WORKSPACE_ID': workspace_id,
+            'LOGGING_CONFIGURATION_NAME': resource_name,
+            'LOG_GROUP_ARN': log_group_arn,
+        }
 
         resource_data = load_prometheusservice_resource(
             "logging_configuration",
@@ -107,27 +80,32 @@ class TestLoggingConfiguration:
         )
 
         # Create logging configuration
+        # Registered first so the CR is cleaned up even if an assertion below fails
+        created_resources.append(lc_ref)
         k8s.create_custom_resource(lc_ref, resource_data)
         lc_resource = k8s.wait_resource_consumed_by_controller(lc_ref)
 
         assert k8s.get_resource_exists(lc_ref)
         assert lc_resource is not None
-        assert 'status' in lc_resource
-        assert 'statusCode' in lc_resource['status']
-        assert lc_resource['status']['statusCode'] == 'CREATING'
+        assert _lc_status(lc_resource) == 'CREATING'
         assert lc_resource['spec']['workspaceID'] == workspace_id
         assert lc_resource['spec']['logGroupARN'] == log_group_arn
         condition.assert_not_synced(lc_ref)
 
         # Wait for the resource to get synced
-        assert k8s.wait_on_condition(lc_ref, "ACK.ResourceSynced", "True", wait_periods=MAX_WAIT_FOR_SYNCED_MINUTES)
+        synced_resource = condition.wait_on_condition_watch(
+            lc_ref, condition.CONDITION_TYPE_RESOURCE_SYNCED, True,
+            timeout=MAX_WAIT_FOR_SYNCED_SECONDS,
+        )
+        assert synced_resource is not None
 
-        # After the resource is synced, assert that workspace is active
-        latest = self.get_logging_configuration(prometheusservice_client, lc_resource['spec']['workspaceID'])
-        assert latest is not None
-        assert latest['loggingConfiguration']['status']['statusCode'] == 'ACTIVE'
-        assert latest['loggingConfiguration']['logGroupArn'] == log_group_arn
-        assert latest['loggingConfiguration']['workspace'] == workspace_id
+        if deep_verify:
+            # After the resource is synced, assert that workspace is active
+            latest = self.get_logging_configuration(prometheusservice_client, lc_resource['spec']['workspaceID'])
+            assert latest is not None
+            assert latest['loggingConfiguration']['status']['statusCode'] == 'ACTIVE'
+            assert latest['loggingConfiguration']['logGroupArn'] == log_group_arn
+            assert latest['loggingConfiguration']['workspace'] == workspace_id
 
         # Before we update the logging configuration CR below, we need to check that the
         # logging configuration status field in the CR has been updated to active,
@@ -135,33 +113,35 @@ class TestLoggingConfiguration:
         # The CR's `Status.StatusCode` should be updated because the CR
         # is requeued on successful reconciliation loops and subsequent
         # reconciliation loops call ReadOne and should update the CR's Status
-        # with the latest observed information. 
-        lc_resource = k8s.get_resource(lc_ref)
-        assert lc_resource is not None
-        assert 'status' in lc_resource
-        assert 'statusCode' in lc_resource['status']
-        assert lc_resource['status']['statusCode'] == 'ACTIVE'
-        condition.assert_synced(lc_ref)
+        # with the latest observed information. The resource returned by the
+        # wait above is the synced one, so it does not need to be fetched again.
+        lc_resource = synced_resource
+        assert _lc_status(lc_resource) == 'ACTIVE'
 
         # Update the log group ARN
-        new_log_group_arn = get_bootstrap_resources().LoggingConfigurationLogGroup2.arn
         updates = {
             "spec": {"logGroupARN": new_log_group_arn},
         }
 
         res= k8s.patch_custom_resource(lc_ref, updates)
-        time.sleep(MODIFY_WAIT_AFTER_SECONDS)
+        # Wait for AMP to report the new log group ARN before waiting on the sync.
+        assert waits.wait_until(
+            lambda: ((self.get_logging_configuration(prometheusservice_client, workspace_id)
+                      or {}).get('loggingConfiguration', {}).get('logGroupArn') == new_log_group_arn),
+            MAX_WAIT_FOR_SYNCED_SECONDS,
+        )
         # wait for the resource to get synced after the patch
-        assert k8s.wait_on_condition(lc_ref, "ACK.ResourceSynced", "True", wait_periods=MAX_WAIT_FOR_SYNCED_MINUTES)
-        latest = self.get_logging_configuration(prometheusservice_client, lc_resource['spec']['workspaceID'])
-        assert latest is not None
-        assert latest['loggingConfiguration']['logGroupArn'] == new_log_group_arn
-        assert latest['loggingConfiguration']['workspace'] == workspace_id
-
-
-        _, deleted = k8s.delete_custom_resource(lc_ref)
-        assert deleted
-        logging_configuration = self.get_logging_configuration(prometheusservice_client, lc_resource['spec']['workspaceID'])
-        assert logging_configuration is None
-
-        time.sleep(DELETE_WAIT_AFTER_SECONDS)
\ No newline at end of file
+        assert condition.wait_on_condition_watch(lc_ref, condition.CONDITION_TYPE_RESOURCE_SYNCED, True, timeout=MAX_WAIT_FOR_SYNCED_SECONDS)
+        if deep_verify:
+            latest = self.get_logging_configuration(prometheusservice_client, lc_resource['spec']['workspaceID'])
+            assert latest is not None
+            assert latest['loggingConfiguration']['logGroupArn'] == new_log_group_arn
+            assert latest['loggingConfiguration']['workspace'] == workspace_id
+
+
+        waits.fast_delete(lc_ref)
+        assert waits.wait_until_deleted(lc_ref, DELETE_WAIT_AFTER_SECONDS)
+        assert waits.wait_until_gone(
+            lambda: self.get_logging_configuration(prometheusservice_client, lc_resource['spec']['workspaceID']),
+            DELETE_WAIT_AFTER_SECONDS,
+        )
\ No newline at end of file
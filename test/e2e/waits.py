@@ -0,0 +1,197 @@
+# Copyright Amazon.com Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may
+# not use this file except in compliance with the License. A copy of the
+# License is located at
+#
+#	 http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Utility functions to wait on resource state without fixed sleeps"""
+
+import time
+from typing import Any, Callable, Iterable, Optional, Sequence, Union
+
+from acktest.k8s import resource as k8s
+from kubernetes import client
+
+
+def wait_until(
+    predicate: Callable[[], bool],
+    timeout: float,
+    interval: float = 0.5,
+    max_interval: float = 15,
+) -> bool:
+    """Polls `predicate` until it returns a truthy value.
+
+    The delay between checks starts at `interval` seconds and doubles after
+    every check up to `max_interval`, so conditions that are met quickly are
+    seen within a second while long waits do not poll more than necessary.
+
+    Tests use this to wait for a patch to reach the AWS resource. Until the
+    controller picks up a patch, the CR still shows the status and the
+    ACK.ResourceSynced condition from before it, and a tag-only update never
+    changes either, so waiting on the CR alone can return too early.
+
+    Usage:
+        from e2e import waits
+
+        assert waits.wait_until(
+            lambda: describe_resource(client, resource_id)['tags'] == {},
+            timeout=20)
+
+    Returns:
+        True as soon as `predicate` holds, False if `timeout` seconds elapse
+        first.
+    """
+    deadline = time.monotonic() + timeout
+    delay = interval
+    while True:
+        if predicate():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_interval)
+
+
+def wait_for_status(
+    get_status: Callable[[], Optional[str]],
+    expected: Union[str, Iterable[str]],
+    timeout: float,
+    interval: float = 0.5,
+) -> bool:
+    """Polls `get_status` until it returns one of the expected status codes.
+
+    Usage:
+        from e2e import waits
+
+        assert waits.wait_for_status(
+            lambda: get_status_code(ref), "ACTIVE", timeout=120)
+
+    Returns:
+        True as soon as an expected status is observed, False if `timeout`
+        seconds elapse first.
+    """
+    if isinstance(expected, str):
+        expected = (expected,)
+    expected = frozenset(expected)
+    return wait_until(lambda: get_status() in expected, timeout, interval)
+
+
+def wait_until_gone(
+    get: Callable[[], Any],
+    timeout: float,
+    interval: float = 0.5,
+    max_interval: float = 15,
+) -> bool:
+    """Polls `get` until it returns None, meaning the resource no longer
+    exists.
+
+    Usage:
+        from e2e import waits
+
+        assert waits.wait_until_gone(
+            lambda: describe_resource(client, resource_id), timeout=60)
+
+    Returns:
+        True as soon as the resource is gone, False if `timeout` seconds
+        elapse first.
+    """
+    return wait_until(lambda: get() is None, timeout, interval, max_interval)
+
+
+def get_status_code(
+    resource: Optional[dict],
+    path: Sequence[str] = ('status', 'statusCode'),
+) -> Optional[str]:
+    """Returns the status code found at `path` in the supplied custom resource,
+    or None if any part of the path is missing.
+    """
+    value = resource
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def wait_for_k8s_status(
+    ref: k8s.CustomResourceReference,
+    expected: Union[str, Iterable[str]],
+    timeout: float,
+    interval: float = 0.5,
+    path: Sequence[str] = ('status', 'statusCode'),
+) -> bool:
+    """Polls the supplied custom resource until the status code at `path` is
+    one of the expected status codes.
+
+    Usage:
+        from acktest.k8s import resource as k8s
+        from e2e import waits
+
+        k8s.patch_custom_resource(ref, updates)
+        assert waits.wait_for_k8s_status(ref, ("UPDATING", "ACTIVE"), 20)
+
+    Returns:
+        True as soon as an expected status is observed, False if `timeout`
+        seconds elapse first.
+    """
+    return wait_for_status(
+        lambda: get_status_code(k8s.get_resource(ref), path),
+        expected, timeout, interval=interval,
+    )
+
+
+def fast_delete(ref: k8s.CustomResourceReference) -> None:
+    """Deletes the supplied custom resource without waiting for it to go away.
+
+    Unlike `k8s.delete_custom_resource`, which sleeps before checking whether
+    the resource is gone, this returns as soon as the API server accepts the
+    request. Callers that depend on the deletion having completed should
+    follow up with `wait_until_deleted`.
+
+    Usage:
+        from e2e import waits
+
+        waits.fast_delete(ref)
+        assert waits.wait_until_deleted(ref, timeout=60)
+    """
+    _api = client.CustomObjectsApi(k8s._get_k8s_api_client())
+    body = client.V1DeleteOptions(
+        grace_period_seconds=0,
+        propagation_policy="Background",
+    )
+    if ref.namespace is None:
+        _api.delete_cluster_custom_object(
+            ref.group, ref.version, ref.plural, ref.name, body=body)
+    else:
+        _api.delete_namespaced_custom_object(
+            ref.group, ref.version, ref.namespace, ref.plural, ref.name,
+            body=body)
+
+
+def wait_until_deleted(
+    ref: k8s.CustomResourceReference,
+    timeout: float,
+    interval: float = 0.5,
+    max_interval: float = 15,
+) -> bool:
+    """Polls the supplied custom resource until it no longer exists, i.e. the
+    controller has removed its finalizer after deleting the AWS resource.
+    Pass `max_interval=interval` to poll at a fixed rate when the caller must
+    act right after the resource is gone.
+
+    Returns:
+        True as soon as the custom resource is gone, False if `timeout`
+        seconds elapse first.
+    """
+    return wait_until_gone(
+        lambda: ref if k8s.get_resource_exists(ref) else None,
+        timeout, interval=interval, max_interval=max_interval,
+    )